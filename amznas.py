@@ -10,6 +10,7 @@ try:
     import re
     import glob
     import subprocess
+    import struct
     import yaml
     import numpy as np
     import pandas as pd
@@ -202,6 +203,17 @@ UtteranceID = {item}_{token}
 Utterance = {utt}
 '''
 
+def get_chan(lx, dev_version):
+    '''Return list of channel labels for an acquisition.'''
+    if lx is True and dev_version == '1':
+        return ['audio', 'lx', 'orfl', 'nsfl']
+    elif lx is True:
+        return ['audio', 'orfl', 'lx', 'nsfl']
+    elif dev_version == '1':
+        return ['audio', None, 'orfl', 'nsfl']
+    else:
+        return ['audio', 'orfl', None, 'nsfl']
+
 def run_acq(fpath, inifile, seconds):
     '''Run an acquisition.'''
     args = [
@@ -218,25 +230,105 @@ def run_acq(fpath, inifile, seconds):
     except KeyboardInterrupt:
         pass
 
+def chunks_reach_eof(fh, pos, fsize):
+    '''
+    Return True if the chunk headers starting at byte `pos` of open file
+    `fh` form a chain that ends at `fsize`, the end of the file.
+    '''
+    while pos < fsize:
+        fh.seek(pos)
+        chdr = fh.read(8)
+        if len(chdr) < 8:
+            return False
+        chid, chsize = struct.unpack('<4sI', chdr)
+        if not all(32 <= b < 127 for b in chid):
+            return False
+        pos += 8 + chsize
+        # The pad byte after an odd-sized last chunk is sometimes omitted.
+        if chsize % 2 == 1 and pos != fsize:
+            pos += 1
+    return pos == fsize
+
+def repair_wav(wav, dry_run=False):
+    '''
+    Validate the RIFF and data chunk sizes in the header of `wav` and patch
+    them in place if they are inconsistent with the file, as happens when an
+    acquisition is interrupted. Only the chunk headers are read, and the
+    audio data is not rewritten. If `dry_run` is True, report the problem
+    without modifying the file.
+
+    The data chunk size is repaired if the declared size runs past the end
+    of the file, if it is a placeholder value (0 or 0xFFFFFFFF) for the last
+    chunk, or if the bytes that follow the declared data are not valid
+    chunks. In those cases the data runs to the end of the file, and a
+    trailing partial frame is truncated. The RIFF size is repaired if it
+    does not match the file length.
+
+    Return one of 'ok', 'repaired' (or 'repairable' in a dry run), or
+    'corrupt' if the file cannot be repaired.
+    '''
+    fsize = os.path.getsize(wav)
+    with open(wav, 'rb') as fh:
+        hdr = fh.read(12)
+        if len(hdr) < 12 or hdr[:4] != b'RIFF' or hdr[8:] != b'WAVE':
+            return 'corrupt'
+        riffsize = struct.unpack('<I', hdr[4:8])[0]
+        block_align = None
+        pos = 12
+        # Walk the chunk headers until we find the data chunk.
+        while True:
+            fh.seek(pos)
+            chdr = fh.read(8)
+            if len(chdr) < 8:
+                return 'corrupt'
+            chid, chsize = struct.unpack('<4sI', chdr)
+            if chid == b'fmt ':
+                fmt = fh.read(16)
+                if len(fmt) < 16:
+                    return 'corrupt'
+                block_align = struct.unpack('<H', fmt[12:14])[0]
+            elif chid == b'data':
+                break
+            pos += 8 + chsize + (chsize % 2)
+        if block_align is None or block_align == 0:
+            return 'corrupt'
+        datapos = pos + 8
+        dataend = datapos + chsize
+        if dataend > fsize:
+            data_ok = False
+        elif chsize in (0, 0xFFFFFFFF) or dataend < fsize:
+            # The declared data size is consistent only if what follows
+            # the data is a chain of valid chunks.
+            data_ok = chunks_reach_eof(fh, dataend, fsize) or \
+                chunks_reach_eof(fh, dataend + (chsize % 2), fsize)
+        else:
+            data_ok = True
+    if data_ok is True:
+        newdatasize = chsize
+        newfsize = fsize
+    else:
+        newdatasize = ((fsize - datapos) // block_align) * block_align
+        newfsize = datapos + newdatasize
+    newriffsize = newfsize - 8
+    if newdatasize == chsize and newriffsize == riffsize and \
+        newfsize == fsize:
+        return 'ok'
+    if dry_run is True:
+        return 'repairable'
+    with open(wav, 'r+b') as fh:
+        if newfsize != fsize:
+            fh.truncate(newfsize)
+        fh.seek(4)
+        fh.write(struct.pack('<I', newriffsize))
+        fh.seek(pos + 4)
+        fh.write(struct.pack('<I', newdatasize))
+    return 'repaired'
+
 def stash_chanmeans(wav, chan, token, sessdir, lang, spkr, researcher, today):
     '''
     Store channel means in a yaml file in the session directory.
     '''
-    yamlfile = os.path.join(
-        sessdir,
-        f'{lang}_{spkr}_{today}_session.yaml'
-    )
-    try:
-        with open(yamlfile, 'r') as fh:
-            sessmd = yaml.safe_load(fh)
-    except FileNotFoundError:
-        sessmd = {
-            'session': {
-                'spkr': spkr,
-                'lang': lang,
-            },
-            'acq': []
-        }
+    sessmd = load_sess_yaml(sessdir, lang=lang, spkr=spkr, today=today)
     (rate, data) = scipy.io.wavfile.read(wav)
     cmeans = data.mean(axis=0)
     chanmeans = []
@@ -257,8 +349,10 @@ def stash_chanmeans(wav, chan, token, sessdir, lang, spkr, researcher, today):
         'fname': os.path.basename(wav),
         'channels': chanmeans
     })
-    with open(yamlfile, 'w') as fh:
-        yaml.dump(sessmd, fh, sort_keys=False)
+    # A new _zero_ token changes the baseline model, and cached offsets
+    # are no longer valid.
+    sessmd.pop('offsets', None)
+    save_sess_yaml(sessmd, sessdir, lang=lang, spkr=spkr, today=today)
 
 def load_sess_yaml(sessdir, lang, spkr, today):
     '''
@@ -281,8 +375,279 @@ def load_sess_yaml(sessdir, lang, spkr, today):
         }
     return sessmd
 
-def wav_display(wav, chan, cutoff, lporder, chanmeans):
-    (rate, data) = scipy.io.wavfile.read(wav)
+def save_sess_yaml(sessmd, sessdir, lang, spkr, today):
+    '''
+    Save session metadata to yaml file.
+    '''
+    yamlfile = os.path.join(
+        sessdir,
+        f'{lang}_{spkr}_{today}_session.yaml'
+    )
+    with open(yamlfile, 'w') as fh:
+        yaml.dump(sessmd, fh, sort_keys=False)
+
+def zero_chanmeans(sessmd, token):
+    '''
+    Return the flow channel means of a single _zero_ token from session
+    metadata, or an empty list if the token is not found.
+    '''
+    for a in sessmd['acq']:
+        if a['item'] == '_zero_' and a['token'] == token:
+            chanmeans = np.zeros(len(a['channels']))
+            for c in a['channels']:
+                if c['type'] in ('orfl', 'nsfl'):
+                    chanmeans[c['idx']] = c['mean']
+            return chanmeans
+    return []
+
+def fname_times(fnames):
+    '''
+    Return acquisition times of .wav filenames, in seconds, parsed from the
+    filename timestamps. The time is NaN for filenames that do not match
+    `wavpat` or do not have a valid timestamp.
+    '''
+    tstamps = pd.Series(fnames, dtype=object).str.extract(wavpat)['tstamp']
+    times = pd.to_datetime(
+        tstamps, format='%Y%m%dT%H%M%S', errors='coerce'
+    )
+    secs = times.values.astype('datetime64[s]').astype(float)
+    secs[times.isna().values] = np.nan
+    return secs
+
+def zero_baseline(sessmd):
+    '''
+    Collect the flow channel means of all _zero_ tokens in session metadata.
+    Return a tuple of (times, means), sorted by time, where `times` has one
+    value per _zero_ token and `means` has shape (n_zero, n_channels).
+    '''
+    zeros = [a for a in sessmd['acq'] if a['item'] == '_zero_']
+    nchan = max([len(a['channels']) for a in zeros], default=0)
+    means = np.zeros((len(zeros), nchan))
+    for zidx, a in enumerate(zeros):
+        for c in a['channels']:
+            if c['type'] in ('orfl', 'nsfl'):
+                means[zidx, c['idx']] = c['mean']
+    times = fname_times([a['fname'] for a in zeros])
+    order = np.argsort(times, kind='stable')
+    # NaN times sort last; drop _zero_ tokens without a timestamp.
+    order = order[~np.isnan(times[order])]
+    return (times[order], means[order])
+
+def interp_offsets(sessmd, fnames):
+    '''
+    Calculate per-token channel offsets for .wav filenames by linear
+    interpolation of the session's _zero_ channel means over time. Tokens
+    recorded before the first or after the last _zero_ token use the nearest
+    _zero_ means. Filenames without a timestamp are left out. Return a dict
+    of offsets keyed by filename, or an empty dict if the session has no
+    _zero_ tokens.
+    '''
+    times, means = zero_baseline(sessmd)
+    t = fname_times(fnames)
+    hastime = ~np.isnan(t)
+    if len(times) == 0 or not hastime.any():
+        return {}
+    fnames = np.array(fnames, dtype=object)[hastime]
+    offsets = np.column_stack([
+        np.interp(t[hastime], times, means[:, cidx])
+        for cidx in range(means.shape[1])
+    ])
+    # Cast to float so that yaml.dump exports simple floats.
+    return {
+        fname: [float(v) for v in row] for fname, row in zip(fnames, offsets)
+    }
+
+def session_offsets(wav, sessdir, lang, spkr, today):
+    '''
+    Look up the interpolated channel offsets for `wav` in the session
+    metadata cache. If not already cached, calculate the offsets and add
+    them to the cache. Return an empty list if the offsets cannot be
+    calculated.
+    '''
+    fname = os.path.basename(wav)
+    if np.isnan(fname_times([fname])[0]):
+        print(f"Can't interpolate means for {fname}: no timestamp in filename.")
+        return []
+    sessmd = load_sess_yaml(sessdir, lang=lang, spkr=spkr, today=today)
+    offsets = sessmd.get('offsets') or {}
+    try:
+        return offsets[fname]
+    except KeyError:
+        offsets.update(interp_offsets(sessmd, [fname]))
+    if fname not in offsets:
+        print("Didn't find any _zero_ tokens for the session!")
+        return []
+    sessmd['offsets'] = offsets
+    save_sess_yaml(sessmd, sessdir, lang=lang, spkr=spkr, today=today)
+    return offsets[fname]
+
+def active_regions(data, rate, chan, frame=0.01, audio_db=15.0,
+    lead=0.1, flow_k=5.0, flow_min=0.003, mingap=0.25, mindur=0.05, pad=0.1):
+    '''
+    Find regions of speech and airflow activity in multichannel data.
+
+    Channels are decimated to one value per `frame` seconds: the standard
+    deviation of each frame for 'audio' and the frame mean for the flow
+    channels ('orfl', 'nsfl'). Audio frames are active if they are more than
+    `audio_db` dB above the noise floor (10th percentile). The flow baseline
+    and noise floor are the median and the median absolute deviation of the
+    frame means in the first `lead` seconds of the recording, before the
+    speaker can start an utterance. The trailing edge is not used, since
+    airflow may continue until the acquisition is stopped. Flow frames are
+    active if their deviation from the baseline is more than `flow_k` times
+    the noise floor and more than `flow_min`, a fraction of the full scale of
+    the sample dtype (0.003 is about 100 units of int16 data), so that a
+    channel without airflow does not mark frames as active. Active frames separated by less
+    than `mingap` seconds are merged, regions shorter than `mindur` seconds
+    are discarded, and the remaining regions are padded by `pad` seconds.
+
+    Return an array of shape (n_regions, 2) of region start and end times
+    in seconds.
+    '''
+    hop = max(int(rate * frame), 1)
+    nfrm = data.shape[0] // hop
+    nlead = min(max(int(lead / frame), 1), nfrm)
+    if np.issubdtype(data.dtype, np.integer):
+        fullscale = float(np.iinfo(data.dtype).max)
+    else:
+        fullscale = 1.0
+    active = np.zeros(nfrm, dtype=bool)
+    for cidx, c in enumerate(chan):
+        if c not in ('audio', 'orfl', 'nsfl') or nfrm == 0:
+            continue
+        frms = data[:nfrm * hop, cidx].reshape(nfrm, hop).astype(np.float32)
+        if c == 'audio':
+            env = 20 * np.log10(frms.std(axis=1) + np.finfo(np.float32).eps)
+            active |= env > np.percentile(env, 10) + audio_db
+        else:
+            fmeans = frms.mean(axis=1)
+            baseline = np.median(fmeans[:nlead])
+            # Scale the MAD to be comparable to a standard deviation.
+            noise = 1.4826 * np.median(np.abs(fmeans[:nlead] - baseline))
+            dev = np.abs(fmeans - baseline)
+            active |= dev > max(flow_k * noise, flow_min * fullscale)
+    # Find runs of active frames.
+    edges = np.diff(np.concatenate([[0], active.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) > 1:
+        keep = (starts[1:] - ends[:-1]) * frame >= mingap
+        starts = starts[np.concatenate([[True], keep])]
+        ends = ends[np.concatenate([keep, [True]])]
+    long_enough = (ends - starts) * frame >= mindur
+    starts = starts[long_enough]
+    ends = ends[long_enough]
+    dur = data.shape[0] / rate
+    return np.column_stack([
+        np.clip(starts * hop / rate - pad, 0, dur),
+        np.clip(ends * hop / rate + pad, 0, dur)
+    ])
+
+def seg_path(wav):
+    '''Return path of the segmentation sidecar file for `wav`.'''
+    return Path(wav).with_suffix('.seg.yaml')
+
+def write_regions(wav, rate, nsamp, regions, textgrid=False):
+    '''
+    Write active regions of `wav` to a yaml sidecar file and, optionally, a
+    Praat TextGrid with an 'active' interval tier.
+    '''
+    dur = nsamp / rate
+    # If we don't cast to float yaml.dump exports the values
+    # as numpy objects instead of simple floats.
+    regions = [[float(t1), float(t2)] for t1, t2 in regions]
+    with open(seg_path(wav), 'w') as fh:
+        yaml.dump(
+            {
+                'fname': os.path.basename(wav),
+                'duration': float(dur),
+                'regions': regions,
+                'active': [regions[0][0], regions[-1][1]] if regions else None
+            },
+            fh,
+            sort_keys=False
+        )
+    if textgrid is True:
+        intervals = []
+        t = 0.0
+        for t1, t2 in regions:
+            if t1 > t:
+                intervals.append((t, t1, ''))
+            intervals.append((t1, t2, 'active'))
+            t = t2
+        if t < dur:
+            intervals.append((t, dur, ''))
+        lines = [
+            'File type = "ooTextFile"',
+            'Object class = "TextGrid"',
+            '',
+            'xmin = 0',
+            f'xmax = {dur}',
+            'tiers? <exists>',
+            'size = 1',
+            'item []:',
+            '    item [1]:',
+            '        class = "IntervalTier"',
+            '        name = "active"',
+            '        xmin = 0',
+            f'        xmax = {dur}',
+            f'        intervals: size = {len(intervals)}',
+        ]
+        for iidx, (t1, t2, label) in enumerate(intervals):
+            lines.extend([
+                f'        intervals [{iidx+1}]:',
+                f'            xmin = {t1}',
+                f'            xmax = {t2}',
+                f'            text = "{label}"',
+            ])
+        with open(Path(wav).with_suffix('.TextGrid'), 'w') as fh:
+            fh.write('\n'.join(lines) + '\n')
+
+def remove_orphan_sidecars(sessdir):
+    '''
+    Remove segmentation sidecar files, and their TextGrids, from `sessdir`
+    when the .wav file they belong to no longer exists, e.g. after a
+    recording is deleted from the display. Return the number of .wav files
+    whose sidecars were removed.
+    '''
+    nremoved = 0
+    for seg in Path(sessdir).rglob('*.seg.yaml'):
+        wav = seg.with_name(seg.name[:-len('.seg.yaml')] + '.wav')
+        if wav.exists():
+            continue
+        seg.unlink()
+        tg = wav.with_suffix('.TextGrid')
+        if tg.exists():
+            tg.unlink()
+        nremoved += 1
+    return nremoved
+
+def read_active(wav):
+    '''
+    Read the active region of `wav`, as found in its segmentation sidecar
+    file. Only the samples in the active region are loaded. If there is no
+    sidecar file, or it contains no active region, read the entire file.
+    Return a tuple of (rate, data, start), where `start` is the time of the
+    first sample of `data` in seconds.
+    '''
+    try:
+        with open(seg_path(wav), 'r') as fh:
+            active = yaml.safe_load(fh)['active']
+    except FileNotFoundError:
+        active = None
+    if active is None:
+        (rate, data) = scipy.io.wavfile.read(wav)
+        return (rate, data, 0.0)
+    (rate, data) = scipy.io.wavfile.read(wav, mmap=True)
+    s1, s2 = int(active[0] * rate), int(np.ceil(active[1] * rate))
+    return (rate, np.array(data[s1:s2]), s1 / rate)
+
+def wav_display(wav, chan, cutoff, lporder, chanmeans, trim=False):
+    if trim is True:
+        (rate, data, start) = read_active(wav)
+    else:
+        (rate, data) = scipy.io.wavfile.read(wav)
+        start = 0.0
     if len(chanmeans) == data.shape[1]:
         data -= np.array(chanmeans).astype(data.dtype)
     r = egg_display(
@@ -293,7 +658,8 @@ def wav_display(wav, chan, cutoff, lporder, chanmeans):
         title=wav,
         cutoff=cutoff,
         order=lporder,
-        acqfile=wav
+        acqfile=wav,
+        t0=start
     )
     #print(f'egg_display returned "{r}"')
 
@@ -309,12 +675,13 @@ def cli():
 @click.option('--utt', required=False, default='', help='Utterance metadata (optional)')
 @click.option('--seconds', required=False, default='', help='Acquisition duration (optional)')
 @click.option('--autozero', required=False, default='0', type=int, help='Remove mean from display using _zero_ token # (optional)')
+@click.option('--interp', is_flag=True, help='Remove means interpolated over all _zero_ tokens in the session')
 @click.option('--lx', is_flag=True, help='Turn on LX (EGG) channel')
 @click.option('--no-disp', is_flag=True, help='Skip display after acquisition')
 @click.option('--cutoff', required=False, default=50, help='Lowpass filter cutoff in Hz (optional; default 50)')
 @click.option('--lporder', required=False, default=3, help='Lowpass filter order (optional; default 3)')
 @click.option('--dev-version', required=False, default='2', help='EGG-D800 device version (optional; default 2)')
-def acq(spkr, lang, researcher, item, utt, seconds, autozero, lx, no_disp, cutoff, lporder, dev_version):
+def acq(spkr, lang, researcher, item, utt, seconds, autozero, interp, lx, no_disp, cutoff, lporder, dev_version):
     '''
     Make a recording.
     '''
@@ -330,15 +697,18 @@ def acq(spkr, lang, researcher, item, utt, seconds, autozero, lx, no_disp, cutof
     with open(inifile, 'w') as out:
         out.write(ini)
     run_acq(fpath, inifile, seconds)
+    try:
+        status = repair_wav(fpath)
+    except FileNotFoundError:
+        print(f'Acquisition file {fpath} was not created.')
+        exit(0)
+    if status == 'repaired':
+        print(f'Repaired .wav header of interrupted acquisition {fpath}.')
+    elif status == 'corrupt':
+        print(f'Acquisition file {fpath} is corrupt and cannot be repaired.')
+        exit(0)
 
-    if lx is True and dev_version == '1':
-        chan = ['audio', 'lx', 'orfl', 'nsfl']
-    elif lx is True:
-        chan = ['audio', 'orfl', 'lx', 'nsfl']
-    elif dev_version == '1':
-        chan = ['audio', None, 'orfl', 'nsfl']
-    else:
-        chan = ['audio', 'orfl', None, 'nsfl']
+    chan = get_chan(lx, dev_version)
 
     if item == '_zero_':
         stash_chanmeans(
@@ -352,18 +722,15 @@ def acq(spkr, lang, researcher, item, utt, seconds, autozero, lx, no_disp, cutof
             today=todaystamp
         )
     if no_disp is False:
-        if autozero >= 0 and item != '_zero_':
+        if interp is True and item != '_zero_':
+            chanmeans = session_offsets(
+                fpath, sessdir, lang=lang, spkr=spkr, today=todaystamp
+            )
+        elif autozero >= 0 and item != '_zero_':
             sessmd = load_sess_yaml(
                 sessdir, lang=lang, spkr=spkr, today=todaystamp
             )
-            chanmeans = []
-            for a in sessmd['acq']:
-                if a['item'] == '_zero_' and a['token'] == autozero:
-                    chanmeans = np.zeros(len(a['channels']))
-                    for c in a['channels']:
-                        if c['type'] in ('orfl', 'nsfl'):
-                            chanmeans[c['idx']] = c['mean']
-                    break
+            chanmeans = zero_chanmeans(sessmd, autozero)
             if len(chanmeans) == 0:
                 print(f"Didn't find _zero_ token {autozero} for the current session!")
         else:
@@ -385,16 +752,20 @@ def acq(spkr, lang, researcher, item, utt, seconds, autozero, lx, no_disp, cutof
 @click.option('--date', required=False, default='today', help="YYYYMMDD session date")
 @click.option('--token', type=int, required=False, default=-1, help="Token identifier (optional; defaults to last token)")
 @click.option('--autozero', required=False, default='0', type=int, help='Remove mean from display using _zero_ token (optional)')
+@click.option('--interp', is_flag=True, help='Remove means interpolated over all _zero_ tokens in the session')
 @click.option('--lx', is_flag=True, help='Turn on LX (EGG) channel')
+@click.option('--trim', is_flag=True, help='Display only the active region found by `segment` (optional)')
 @click.option('--cutoff', required=False, default=50, help='Lowpass filter cutoff in Hz (optional; default 50)')
 @click.option('--lporder', required=False, default=3, help='Lowpass filter order (optional; default 3)')
 @click.option('--dev-version', required=False, default='2', help='EGG-D800 device version (optional; default 2)')
-def disp(wavfile, spkr, lang, researcher, item, date, token, autozero, lx,
-    cutoff, lporder, dev_version):
+def disp(wavfile, spkr, lang, researcher, item, date, token, autozero, interp,
+    lx, trim, cutoff, lporder, dev_version):
     '''
     Display an eggd800 wavfile recording. If given, the --wavfile parameter
     identifies the .wav file to display. Otherwise, the name is constructed
     from the other parameters in a way that matches the acq() parameters.
+    When --wavfile is given, the language, speaker, and session date used to
+    find the session's _zero_ tokens are taken from the filename.
 
     The --token parameter is used to specify the token identifier.
     Use negative values to count tokens in reverse: -1 for last token,
@@ -404,9 +775,30 @@ def disp(wavfile, spkr, lang, researcher, item, date, token, autozero, lx,
     acquisition session to use for calculating the channel means. Use the
     value -1 to indicate that the display should not be adjusted by the
     channel means.
+
+    The --interp flag removes channel means interpolated between all of the
+    _zero_ tokens in the session, based on the acquisition times. It
+    overrides --autozero. Run the `calibrate` command to precompute the
+    interpolated means for all tokens in a session.
+
+    The --trim flag displays only the active region of the recording, as
+    found by the `segment` command. Lead-in and trailing silence are not
+    loaded, and the time axis still shows times in the original file.
     '''
     if wavfile is not None:
         sessdir = Path(wavfile).parent
+        # Session identifiers come from the filename, which is needed to
+        # find the session yaml file.
+        m = wavpat.search(os.path.basename(wavfile))
+        if m is not None:
+            lang = m.group('lang')
+            spkr = m.group('spkr')
+            date = m.group('tstamp').split('T')[0]
+        elif autozero >= 0 or interp is True:
+            print(f'Could not get session from filename {wavfile}. '
+                  'Channel means will not be removed.')
+            autozero = -1
+            interp = False
     else:
         if date == 'today':
             date = dt.strftime(dt.today(), '%Y%m%d')
@@ -429,24 +821,14 @@ def disp(wavfile, spkr, lang, researcher, item, date, token, autozero, lx,
             exit(0)
         else:
             wavfile = wavfiles[0]
-    if lx is True and dev_version == '1':
-        chan = ['audio', 'lx', 'orfl', 'nsfl']
-    elif lx is True:
-        chan = ['audio', 'orfl', 'lx', 'nsfl']
-    elif dev_version == '1':
-        chan = ['audio', None, 'orfl', 'nsfl']
-    else:
-        chan = ['audio', 'orfl', None, 'nsfl']
-    if autozero >= 0:
+    chan = get_chan(lx, dev_version)
+    if interp is True:
+        chanmeans = session_offsets(
+            wavfile, sessdir, lang=lang, spkr=spkr, today=date
+        )
+    elif autozero >= 0:
         sessmd = load_sess_yaml(sessdir, lang=lang, spkr=spkr, today=date)
-        chanmeans = []
-        for a in sessmd['acq']:
-            if a['item'] == '_zero_' and a['token'] == autozero:
-                chanmeans = np.zeros(len(a['channels']))
-                for c in a['channels']:
-                    if c['type'] in ('orfl', 'nsfl'):
-                        chanmeans[c['idx']] = c['mean']
-                break
+        chanmeans = zero_chanmeans(sessmd, autozero)
         if len(chanmeans) == 0:
             print(f"Didn't find _zero_ token {autozero} for the session!")
     else:
@@ -456,9 +838,80 @@ def disp(wavfile, spkr, lang, researcher, item, date, token, autozero, lx,
         chan=chan,
         cutoff=cutoff,
         lporder=lporder,
-        chanmeans=chanmeans
+        chanmeans=chanmeans,
+        trim=trim
     )
 
+@cli.command()
+@click.option('--spkr', callback=validate_ident, help='Three-letter speaker identifier')
+@click.option('--lang', callback=validate_ident, help='Three-letter language identifier (ISO 639-3)')
+@click.option('--date', required=False, default='today', help="YYYYMMDD session date")
+@click.option('--lx', is_flag=True, help='Recordings include LX (EGG) channel')
+@click.option('--textgrid', is_flag=True, help='Also write a TextGrid for each recording (optional)')
+@click.option('--overwrite', is_flag=True, help='Resegment recordings that already have a sidecar file (optional)')
+@click.option('--dev-version', required=False, default='2', help='EGG-D800 device version (optional; default 2)')
+def segment(spkr, lang, date, lx, textgrid, overwrite, dev_version):
+    '''
+    Find regions of speech and airflow activity in all recordings in a
+    session. The regions are stored in a .seg.yaml sidecar file next to each
+    .wav file and are used by `disp --trim` to skip lead-in and trailing
+    silence. Sidecar files of deleted recordings are removed.
+    '''
+    if date == 'today':
+        date = dt.strftime(dt.today(), '%Y%m%d')
+    sessdir = os.path.join(datadir, lang, spkr, date)
+    nremoved = remove_orphan_sidecars(sessdir)
+    if nremoved > 0:
+        print(f'Removed sidecar files of {nremoved} deleted recordings.')
+    chan = get_chan(lx, dev_version)
+    wavdf = dir2df(sessdir, fnpat=wavpat)
+    if len(wavdf) == 0:
+        print(f'No .wav files found in {sessdir}.')
+        exit(0)
+    wavdf = wavdf[wavdf['item'] != '_zero_']
+    nseg = 0
+    for row in wavdf.itertuples():
+        wav = os.path.join(sessdir, row.relpath, row.fname)
+        if overwrite is False and seg_path(wav).exists():
+            continue
+        status = repair_wav(wav, dry_run=True)
+        if status != 'ok':
+            print(f'Skipping {status} file {wav}. Run `verify` to repair.')
+            continue
+        (rate, data) = scipy.io.wavfile.read(wav, mmap=True)
+        regions = active_regions(data, rate, chan)
+        write_regions(wav, rate, data.shape[0], regions, textgrid=textgrid)
+        nseg += 1
+    print(f'Segmented {nseg} recordings in {sessdir}.')
+
+@cli.command()
+@click.option('--spkr', callback=validate_ident, help='Three-letter speaker identifier')
+@click.option('--lang', callback=validate_ident, help='Three-letter language identifier (ISO 639-3)')
+@click.option('--date', required=False, default='today', help="YYYYMMDD session date")
+def calibrate(spkr, lang, date):
+    '''
+    Calculate channel offsets for all tokens in a session by interpolating
+    the channel means of all of the session's _zero_ tokens over time. The
+    offsets are cached in the session yaml file for use by `disp --interp`
+    and `acq --interp`.
+    '''
+    if date == 'today':
+        date = dt.strftime(dt.today(), '%Y%m%d')
+    sessdir = os.path.join(datadir, lang, spkr, date)
+    sessmd = load_sess_yaml(sessdir, lang=lang, spkr=spkr, today=date)
+    wavdf = dir2df(sessdir, fnpat=wavpat)
+    if len(wavdf) == 0:
+        print(f'No .wav files found in {sessdir}.')
+        exit(0)
+    fnames = list(wavdf.loc[wavdf['item'] != '_zero_', 'fname'])
+    offsets = interp_offsets(sessmd, fnames)
+    if len(offsets) == 0:
+        print("Didn't find any _zero_ tokens for the session!")
+        exit(0)
+    sessmd['offsets'] = offsets
+    save_sess_yaml(sessmd, sessdir, lang=lang, spkr=spkr, today=date)
+    print(f'Calculated offsets for {len(offsets)} tokens in {sessdir}.')
+
 def check_chans(row, datadir, rolldir, dev_version):
     '''
     Diagnose .wav file for incorrect channel order. Use `np.roll` to rotate
@@ -516,7 +969,32 @@ def rollwav(dev_version):
     todo = pd.merge(wavdf, rolldf, how='left', on=['relpath', 'fname'])
     todo = todo[(todo['item'] != '_zero_') & (todo['rollexists'].isna())]
     for row in todo.itertuples():
+        wav = wavdir / row.relpath / row.fname
+        status = repair_wav(wav, dry_run=True)
+        if status != 'ok':
+            print(f'Skipping {status} file {wav}. Run `verify` to repair.')
+            continue
         check_chans(row, wavdir, rolldir, dev_version=dev_version)
 
+@cli.command()
+@click.option('--dry-run', is_flag=True, help='Report problems without repairing files (optional)')
+def verify(dry_run):
+    '''
+    Check the headers of all amznas .wav files and repair the RIFF and data
+    chunk sizes of files that were truncated by an interrupted acquisition.
+    Files are repaired in place.
+    '''
+    wavdir = Path(datadir)
+    wavdf = dir2df(wavdir, fnpat=wavpat)
+    counts = {'ok': 0, 'repaired': 0, 'repairable': 0, 'corrupt': 0}
+    for row in wavdf.itertuples():
+        wav = wavdir / row.relpath / row.fname
+        status = repair_wav(wav, dry_run=dry_run)
+        counts[status] += 1
+        if status != 'ok':
+            print(f'{status}: {wav}')
+    summary = ', '.join([f'{v} {k}' for k, v in counts.items() if v > 0])
+    print(f'Checked {len(wavdf)} .wav files: {summary}.')
+
 if __name__ == '__main__':
     cli()
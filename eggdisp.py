@@ -65,14 +65,17 @@ class DelBtn(ToolBase):
 class Play(ToolBase):
     '''Play Button for toolbar.'''
 
-    def __init__(self, *args, ax, audio, rate, **kwargs):
+    def __init__(self, *args, ax, audio, rate, t0=0.0, **kwargs):
         super(Play, self).__init__(*args, **kwargs)
         self.ax = ax
         self.audio = audio
         self.rate = rate
+        self.t0 = t0
 
     def trigger(self, sender, event, data):
         xmin, xmax = self.ax.get_xlim()
+        xmin -= self.t0
+        xmax -= self.t0
         xmin = int(xmin * self.rate) if xmin > 0 else 0
         xmax = int(xmax * self.rate) if xmax < len(self.audio) else len(self.audio)
         sd.stop()
@@ -106,10 +109,13 @@ def on_xlim_changed(ax):
         # cache xlim to mark 'a' as treated
         a.xlim = xlim
 
-def egg_display(data, rate, chan, del_btn, title='', cutoff=50, order=3, acqfile=None):
-    '''Make plot from multichannel data.'''
+def egg_display(data, rate, chan, del_btn, title='', cutoff=50, order=3, acqfile=None, t0=0.0):
+    '''
+    Make plot from multichannel data. The first sample of `data` is
+    displayed at time `t0` seconds.
+    '''
     chanmap = {c: idx for idx, c in enumerate(chan) if c is not None}
-    ts = np.arange(data.shape[0]) / rate
+    ts = t0 + np.arange(data.shape[0]) / rate
 
     fig = plt.figure(figsize=(16,5))
     fig.canvas.manager.set_window_title(title)
@@ -143,7 +149,8 @@ def egg_display(data, rate, chan, del_btn, title='', cutoff=50, order=3, acqfile
         Play,
         ax=fig.axes[0],
         audio=data[:,chanmap['audio']],
-        rate=rate
+        rate=rate,
+        t0=t0
     )
     fig.canvas.manager.toolbar.add_tool(tm.get_tool('play'), 'toolgroup1')
     if acqfile is not None: